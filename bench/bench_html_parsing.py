@@ -0,0 +1,110 @@
+"""Micro-benchmark da extração de HTML (Urlebird/Countik)
+
+Mede, por página e por backend instalado (selectolax, lxml, bs4), o tempo
+médio de parse + extração e o pico de memória alocada (tracemalloc).
+Também mede a extração antiga (BeautifulSoup completo + find com lambdas)
+como referência.
+
+Uso:
+    python bench/bench_html_parsing.py [--iterations 200]
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('DOWNLOAD_DIR', tempfile.mkdtemp(prefix='bench_html_'))
+logging.disable(logging.WARNING)
+
+import app  # noqa: E402
+
+FIXTURES = {
+    'urlebird_video.html': 'video',
+    'urlebird_user.html': 'channel',
+    'countik_user.html': 'channel',
+}
+
+
+def extract(html, kind, backend):
+    if kind == 'video':
+        doc = app.parse_html(html, only=app.VIDEO_PAGE_TAGS, backend=backend)
+        return app.extract_video_details(doc)
+    doc = app.parse_html(html, only=app.CHANNEL_PAGE_TAGS, backend=backend)
+    return app.extract_channel_data(doc), app.extract_first_video_href(doc)
+
+
+def extract_legacy(html, kind):
+    """Extração anterior: árvore BeautifulSoup completa e buscas com lambda"""
+    soup = app.BeautifulSoup(html, 'html.parser')
+    if kind == 'video':
+        result = {
+            'caption': soup.find('h1').get_text(strip=True) if soup.find('h1') else None,
+            'posted_time': soup.find('h6').get_text(strip=True) if soup.find('h6') else None,
+        }
+        stats_div = soup.find('div', class_=lambda x: x and 'stat' in x.lower())
+        if stats_div:
+            result['stats'] = [s.get_text(strip=True) for s in stats_div.find_all('span')]
+        page_text = soup.get_text()
+        re.search(r'([\d.]+[KMB]?)\s*(?:views?|visualizações)', page_text, re.IGNORECASE)
+        video_tag = soup.find('video')
+        if video_tag:
+            source_tag = video_tag.find('source')
+            result['cdn_link'] = video_tag.get('src') or (source_tag.get('src') if source_tag else None)
+        return result
+    result = {}
+    for name in ('follower', 'heart', 'video'):
+        elem = soup.find('span', class_=lambda x: x and name in x.lower())
+        result[name] = elem.get_text(strip=True) if elem else None
+    link = soup.find('a', href=lambda href: href and '/video/' in href)
+    return result, link.get('href', '') if link else None
+
+
+def measure(func, iterations):
+    func()  # aquecimento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    backends = [name for name, available in (
+        ('selectolax', app.SELECTOLAX_AVAILABLE),
+        ('lxml', app.LXML_AVAILABLE),
+        ('bs4', app.BEAUTIFULSOUP_AVAILABLE),
+    ) if available]
+
+    print(f"{'página':<22} {'backend':<12} {'ms/página':>10} {'pico KiB':>10}")
+    for filename, kind in FIXTURES.items():
+        with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+            html = f.read()
+
+        runs = [(backend, lambda b=backend: extract(html, kind, b)) for backend in backends]
+        if app.BEAUTIFULSOUP_AVAILABLE:
+            runs.append(('bs4 (antigo)', lambda: extract_legacy(html, kind)))
+
+        for label, func in runs:
+            elapsed_ms, peak_kib = measure(func, args.iterations)
+            print(f"{filename:<22} {label:<12} {elapsed_ms:>10.3f} {peak_kib:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""Configuração comum dos testes: importa app.py com pasta de downloads temporária"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('DOWNLOAD_DIR', tempfile.mkdtemp(prefix='tests_'))
+# Sem threads de recarga/prober/limpeza disputando estado com os testes
+os.environ.setdefault('CONFIG_RELOAD_INTERVAL', '0')
+os.environ.setdefault('HEALTH_PROBE_INTERVAL', '0')
+os.environ.setdefault('BLOB_PRUNE_INTERVAL', '0')
@@ -0,0 +1,148 @@
+"""Controle de admissão: limites por grupo, jobs em segundo plano e Retry-After"""
+import collections
+import threading
+
+import pytest
+
+import app
+
+
+def fresh_stats():
+    return {'in_flight': 0, 'background': 0, 'admitted': 0, 'rejected': 0, 'duration_ewma': None,
+            'background_duration_ewma': None, 'last_retry_after': None}
+
+
+@pytest.fixture(autouse=True)
+def admission(monkeypatch):
+    """Grupo download com 2 em andamento e 1 na fila; agendador com 1 vaga"""
+    monkeypatch.setattr(app, 'ADMISSION_LIMITS', {'download': (2, 1)})
+    stats = {'download': fresh_stats()}
+    monkeypatch.setattr(app, 'ADMISSION_STATS', stats)
+    monkeypatch.setattr(app, 'WORK_SLOTS', 1)
+    monkeypatch.setattr(app, 'LANES', {
+        lane: {'weight': weight, 'pass': 0.0, 'waiting': collections.deque(), 'running': 0,
+               'granted': 0, 'timeouts': 0, 'waits': collections.deque(maxlen=10)}
+        for lane, weight in ((app.INTERACTIVE_LANE, 4.0), (app.BULK_LANE, 1.0))
+    })
+    return stats['download']
+
+
+def test_admits_until_in_flight_limit(admission):
+    assert app.admit_request('download') == (True, None)
+    assert app.admit_request('download') == (True, None)
+
+    admitted, retry_after = app.admit_request('download')
+    assert not admitted
+    assert retry_after == app.ADMISSION_DEFAULT_RETRY_AFTER
+    assert admission['rejected'] == 1
+
+    app.finish_admitted_request('download', 4.0)
+    assert admission['in_flight'] == 1
+    assert admission['duration_ewma'] == 4.0
+    assert app.admit_request('download') == (True, None)
+
+
+def test_zero_disables_limit(monkeypatch, admission):
+    monkeypatch.setattr(app, 'ADMISSION_LIMITS', {'download': (0, 0)})
+    for _ in range(50):
+        assert app.admit_request('download')[0]
+
+
+def test_retry_after_from_average_duration(admission):
+    admission['duration_ewma'] = 10.0
+    admission['in_flight'] = 2
+    # 10s de duração média, nada na fila, 2 em execução -> ~5s até abrir espaço
+    assert app.admit_request('download') == (False, 5)
+    assert admission['last_retry_after'] == 5
+
+
+def test_retry_after_is_capped(monkeypatch, admission):
+    monkeypatch.setattr(app, 'ADMISSION_MAX_RETRY_AFTER', 30)
+    admission['duration_ewma'] = 1000.0
+    admission['in_flight'] = 2
+    assert app.admit_request('download') == (False, 30)
+
+
+def test_queued_items_of_the_group_are_limited(admission):
+    app.ADMISSION_GROUP_VAR.set('download')
+    try:
+        holder = app.enqueue_work_slot(app.INTERACTIVE_LANE, lambda: None)
+        waiter = app.enqueue_work_slot(app.BULK_LANE, lambda: None)
+    finally:
+        app.ADMISSION_GROUP_VAR.set(None)
+    assert holder['granted'] and not waiter['granted']
+    assert app.queued_work_items('download') == 1
+
+    # Nenhuma requisição em andamento, mas a fila do grupo já está no limite
+    admitted, _ = app.admit_request('download')
+    assert not admitted
+
+    app.abandon_work_slot(waiter)
+    assert app.admit_request('download')[0]
+
+
+def test_items_of_other_groups_do_not_count(admission):
+    app.enqueue_work_slot(app.INTERACTIVE_LANE, lambda: None)
+    app.enqueue_work_slot(app.BULK_LANE, lambda: None)
+    assert app.queued_work_items('download') == 0
+    assert app.admit_request('download')[0]
+
+
+def test_background_jobs_hold_the_group(admission):
+    app.hold_background_admission('download')
+    app.hold_background_admission('download')
+    admitted, retry_after = app.admit_request('download')
+    assert not admitted
+
+    app.release_background_admission('download', 60.0)
+    assert admission['background'] == 1
+    assert admission['background_duration_ewma'] == 60.0
+    assert app.admit_request('download')[0]
+
+
+def test_retry_after_uses_background_duration(admission):
+    admission['duration_ewma'] = 0.01
+    admission['background_duration_ewma'] = 40.0
+    admission['background'] = 2
+    assert app.admit_request('download') == (False, 20)
+
+
+def test_run_in_background_keeps_the_group_until_done(admission):
+    release = threading.Event()
+    seen = []
+
+    def target():
+        seen.append(app.ADMISSION_GROUP_VAR.get())
+        release.wait(5)
+
+    app.ADMISSION_GROUP_VAR.set('download')
+    try:
+        thread = app.run_in_background(target, name='test-admission')
+    finally:
+        app.ADMISSION_GROUP_VAR.set(None)
+    assert admission['background'] == 1
+
+    release.set()
+    thread.join(5)
+    assert seen == ['download']
+    assert admission['background'] == 0
+
+
+def test_endpoint_returns_429_with_retry_after(admission):
+    admission['in_flight'] = 2
+    client = app.app.test_client()
+    response = client.post('/download/jobs', json={'urls': ['https://www.tiktok.com/@a/video/1']})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(app.ADMISSION_DEFAULT_RETRY_AFTER)
+    assert response.get_json()['retry_after'] == app.ADMISSION_DEFAULT_RETRY_AFTER
+    # A requisição recusada não ocupa lugar
+    assert admission['in_flight'] == 2
+
+
+def test_admitted_request_is_released_on_teardown(admission):
+    client = app.app.test_client()
+    response = client.post('/download', json={})
+    assert response.status_code == 400
+    assert admission['admitted'] == 1
+    assert admission['in_flight'] == 0
+    assert admission['duration_ewma'] is not None
@@ -0,0 +1,154 @@
+"""Paginação dos vídeos de um canal: since, cursores opacos e próxima página"""
+import threading
+
+import pytest
+
+import app
+
+# IDs em ordem decrescente (mais novo primeiro), como os provedores devolvem
+IDS = ['7400000000000000005', '7400000000000000004', '7400000000000000003',
+       '7400000000000000002', '7400000000000000001']
+
+
+@pytest.fixture(autouse=True)
+def video_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'VIDEO_DB_PATH', str(tmp_path / 'videos.db'))
+    monkeypatch.setattr(app, 'VIDEO_DB_LOCAL', threading.local())
+
+
+def entries(*posted):
+    return [{'video_id': str(i), 'posted_ts': ts} for i, ts in enumerate(posted)]
+
+
+def test_parse_since_accepts_epoch_iso_and_video_id():
+    assert app.parse_since(None) == (None, None)
+    assert app.parse_since('1700000000') == ((1700000000, None), None)
+    assert app.parse_since('2024-01-01T00:00:00Z') == ((1704067200, None), None)
+    assert app.parse_since('2024-01-01') == ((1704067200, None), None)
+    assert app.parse_since(IDS[2]) == ((app.video_id_timestamp(IDS[2]), IDS[2]), None)
+    since, error = app.parse_since('ontem')
+    assert since is None and 'since' in error
+
+
+def test_filter_stops_at_since_timestamp():
+    reached, kept = app.filter_videos_since(entries(300, 200, 100), (200, None))
+    assert reached
+    assert [e['posted_ts'] for e in kept] == [300]
+
+
+def test_filter_stops_at_since_video_id():
+    videos = [{'video_id': video_id, 'posted_ts': None} for video_id in IDS]
+    reached, kept = app.filter_videos_since(videos, (None, IDS[2]))
+    assert reached
+    assert [e['video_id'] for e in kept] == IDS[:2]
+
+
+def test_filter_without_since_keeps_everything():
+    assert app.filter_videos_since(entries(3, 2), None) == (False, entries(3, 2))
+    assert app.filter_videos_since(entries(3, 2), (1, None)) == (False, entries(3, 2))
+
+
+def test_cursor_round_trip_is_bound_to_the_provider():
+    cursor = app.encode_channel_cursor('tikwm', 1712345678)
+    assert '=' not in cursor
+    assert app.decode_channel_cursor(cursor, 'tikwm') == (1712345678, None)
+    assert app.decode_channel_cursor(cursor, 'apify')[1] == "Cursor não pertence ao provedor apify"
+    assert app.decode_channel_cursor('%%%', 'tikwm') == (None, 'Cursor inválido')
+    assert app.decode_channel_cursor(None, 'tikwm') == (None, None)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+@pytest.fixture
+def tikwm(monkeypatch):
+    """API do TikWM simulada: páginas de 2 vídeos sobre IDS, cursor = posição"""
+    requests_sent = []
+
+    async def fake_request(method, url, json=None, **kwargs):
+        requests_sent.append(json)
+        start = int(json['cursor'])
+        page = IDS[start:start + json['count']]
+        return FakeResponse({'code': 0, 'data': {
+            'videos': [{'video_id': video_id} for video_id in page],
+            'hasMore': start + len(page) < len(IDS),
+            'cursor': start + len(page),
+        }})
+
+    monkeypatch.setattr(app, 'async_http_request', fake_request)
+    return requests_sent
+
+
+def test_tikwm_pages_through_the_channel(tikwm):
+    videos, _, cursor, error = app.get_latest_videos_from_channel_tikwm('usuario', limit=2)
+    assert error is None
+    assert [v['video_id'] for v in videos] == IDS[:2]
+
+    videos, _, cursor, error = app.get_latest_videos_from_channel_tikwm('usuario', limit=2, cursor=cursor)
+    assert error is None
+    assert [v['video_id'] for v in videos] == IDS[2:4]
+    # O cursor opaco é decodificado antes de ir para a API
+    assert tikwm[1]['cursor'] == 2
+
+    videos, _, cursor, _ = app.get_latest_videos_from_channel_tikwm('usuario', limit=2, cursor=cursor)
+    assert [v['video_id'] for v in videos] == IDS[4:]
+    assert cursor is None
+
+
+def test_tikwm_stops_paging_at_since(tikwm):
+    videos, _, cursor, error = app.get_latest_videos_from_channel_tikwm(
+        'usuario', limit=2, since=(None, IDS[1]))
+    assert error is None
+    assert [v['video_id'] for v in videos] == IDS[:1]
+    assert cursor is None
+
+
+def test_tikwm_rejects_cursor_of_another_provider(tikwm):
+    cursor = app.encode_channel_cursor('apify', 1712345678)
+    _, _, _, error = app.get_latest_videos_from_channel_tikwm('usuario', limit=2, cursor=cursor)
+    assert error == "Cursor não pertence ao provedor tikwm"
+    assert tikwm == []
+
+
+@pytest.fixture
+def apify(monkeypatch):
+    """Ator do Apify simulado: devolve os itens mais novos que newestPostDate"""
+    inputs = []
+    items = [{'id': video_id, 'createTime': app.video_id_timestamp(video_id) - n * 86400 * 2,
+              'webVideoUrl': f'https://www.tiktok.com/@usuario/video/{video_id}'}
+             for n, video_id in enumerate(IDS)]
+
+    def fake_run(token, run_input, *args, **kwargs):
+        inputs.append(run_input)
+        return [dict(item) for item in items][:run_input['resultsPerPage']], None, None
+
+    monkeypatch.setattr(app, 'APIFY_AVAILABLE', True)
+    monkeypatch.setattr(app, 'CONFIG', app.CONFIG._replace(apify_api_token='token'))
+    monkeypatch.setattr(app, 'run_apify_actor', fake_run)
+    return inputs
+
+
+def test_apify_next_cursor_points_after_the_last_video(apify):
+    videos, _, cursor, error = app.get_latest_videos_from_channel('usuario', limit=2)
+    assert error is None
+    assert [v['video_id'] for v in videos] == IDS[:2]
+    assert apify[0]['resultsPerPage'] == 3
+
+    videos, _, cursor, error = app.get_latest_videos_from_channel('usuario', limit=2, cursor=cursor)
+    assert error is None
+    assert [v['video_id'] for v in videos] == IDS[2:4]
+    assert 'newestPostDate' in apify[1]
+    assert cursor is not None
+
+
+def test_apify_without_more_videos_has_no_cursor(apify):
+    videos, _, cursor, _ = app.get_latest_videos_from_channel('usuario', limit=10)
+    assert len(videos) == len(IDS)
+    assert cursor is None
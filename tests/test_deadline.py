@@ -0,0 +1,111 @@
+"""Prazo da requisição: origem (header/body), propagação ao loop e corte das cadeias de fallback"""
+import time
+
+import pytest
+
+import app
+
+VIDEO_URL = 'https://www.tiktok.com/@usuario/video/1234567890'
+
+
+@pytest.fixture(autouse=True)
+def no_deadline():
+    app.start_deadline(None)
+    app.start_retry_budget()
+    yield
+    app.start_deadline(None)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('30', 30.0), (12.5, 12.5), ('100000', app.REQUEST_MAX_TIMEOUT),
+    ('0', None), ('-5', None), ('abc', None), (None, None),
+])
+def test_parse_request_timeout(value, expected):
+    assert app.parse_request_timeout(value) == expected
+
+
+@pytest.mark.parametrize('headers, body, expected', [
+    ({'X-Request-Timeout': '10'}, {}, 10),
+    ({}, {'timeout_seconds': 20}, 20),
+    ({'X-Request-Timeout': '10'}, {'timeout_seconds': 20}, 10),
+    ({}, {}, app.REQUEST_DEFAULT_TIMEOUT),
+    ({'X-Request-Timeout': 'x'}, {}, app.REQUEST_DEFAULT_TIMEOUT),
+])
+def test_request_deadline_comes_from_header_or_body(headers, body, expected):
+    with app.app.test_request_context('/download', method='POST', headers=headers, json=body):
+        app.init_request_context()
+        assert app.deadline_remaining() == pytest.approx(expected, abs=0.5)
+
+
+def test_deadline_timeout_shrinks_to_remaining_time():
+    assert app.deadline_timeout(15) == 15
+    app.start_deadline(5)
+    assert app.deadline_timeout(15) == pytest.approx(5, abs=0.5)
+    assert app.deadline_timeout(1) == 1
+
+
+def test_expired_deadline_raises():
+    app.start_deadline(0.01)
+    time.sleep(0.02)
+    assert app.deadline_expired()
+    with pytest.raises(app.DeadlineExceeded):
+        app.deadline_timeout(15)
+    with pytest.raises(app.DeadlineExceeded, match='tikwm'):
+        app.check_deadline('tikwm')
+
+
+def test_call_upstream_does_not_start_after_the_deadline():
+    app.start_deadline(0.01)
+    time.sleep(0.02)
+    calls = []
+    with pytest.raises(app.DeadlineExceeded):
+        app.call_upstream(lambda: calls.append(1), 'example.com')
+    assert calls == []
+
+
+def test_deadline_reaches_the_async_loop():
+    async def remaining():
+        return app.deadline_remaining()
+
+    assert app.run_on_async_loop(remaining()) is None
+    app.start_deadline(30)
+    assert app.run_on_async_loop(remaining()) == pytest.approx(30, abs=1)
+
+
+def test_fallback_chain_stops_when_no_time_is_left(monkeypatch):
+    calls = []
+
+    def slow_service(url):
+        calls.append('lento')
+        time.sleep(0.15)
+        return []
+
+    def next_service(url):
+        calls.append('seguinte')
+        return []
+
+    monkeypatch.setattr(app, 'TIKTOK_DOWNLOADER_AVAILABLE', True)
+    monkeypatch.setattr(app, 'DEADLINE_MIN_STAGE_SECONDS', 0.2)
+    monkeypatch.setattr(app, 'get_services_list', lambda: [
+        ('Lento', slow_service, True, False),
+        ('Seguinte', next_service, True, False),
+    ])
+    app.start_deadline(0.3)
+    video_file, error = app.download_tiktok_video(VIDEO_URL)
+    assert video_file is None
+    assert error.startswith(app.DEADLINE_ERROR) and 'Seguinte' in error
+    assert calls == ['lento']
+
+
+def test_download_returns_504_when_the_deadline_expires(monkeypatch):
+    def slow_download(url, progress=None, cancel_event=None, variant='default', report=None):
+        app.check_deadline('download')
+        time.sleep(0.2)
+        app.check_deadline('download')
+        return None, 'não chega aqui'
+
+    monkeypatch.setattr(app, 'download_tiktok_video', slow_download)
+    response = app.app.test_client().post('/download', json={'url': VIDEO_URL},
+                                          headers={'X-Request-Timeout': '0.1'})
+    assert response.status_code == 504
+    assert app.DEADLINE_ERROR in response.get_json()['error']
@@ -0,0 +1,98 @@
+"""Deduplicação por conteúdo: hard links para blobs e limpeza de blobs órfãos"""
+import hashlib
+import os
+import threading
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def blobs(tmp_path, monkeypatch):
+    """BLOB_DIR, banco e estatísticas isolados por teste"""
+    blob_dir = tmp_path / 'blobs'
+    blob_dir.mkdir()
+    monkeypatch.setattr(app, 'BLOB_DIR', str(blob_dir))
+    monkeypatch.setattr(app, 'VIDEO_DB_PATH', str(tmp_path / 'videos.db'))
+    monkeypatch.setattr(app, 'VIDEO_DB_LOCAL', threading.local())
+    monkeypatch.setattr(app, 'STREAM_DIGESTS', {})
+    monkeypatch.setattr(app, 'BLOB_STATS', {'stored': 0, 'deduplicated': 0, 'bytes_saved': 0,
+                                            'pruned': 0, 'last_prune': 0.0})
+    return blob_dir
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_new_content_becomes_a_blob(tmp_path, blobs):
+    path = write(tmp_path / 'a.mp4', b'video-a')
+    sha256, deduplicated = app.deduplicate_file(path)
+    assert sha256 == hashlib.sha256(b'video-a').hexdigest()
+    assert not deduplicated
+    blob_path = blobs / f'{sha256}.mp4'
+    assert os.path.samefile(blob_path, path)
+    assert os.stat(path).st_nlink == 2
+
+
+def test_repeated_content_is_hard_linked(tmp_path, blobs):
+    first = write(tmp_path / 'a.mp4', b'mesmo video')
+    second = write(tmp_path / 'b.mp4', b'mesmo video')
+    app.deduplicate_file(first)
+    sha256, deduplicated = app.deduplicate_file(second)
+
+    assert deduplicated
+    assert os.path.samefile(first, second)
+    assert os.stat(second).st_nlink == 3
+    assert app.BLOB_STATS['deduplicated'] == 1
+    assert app.BLOB_STATS['bytes_saved'] == len(b'mesmo video')
+    assert app.blob_metrics()['unique_blobs'] == 1
+
+
+def test_stream_digest_is_used_instead_of_reading_the_file(tmp_path):
+    path = write(tmp_path / 'a.mp4', b'conteudo')
+    app.remember_stream_digest(path, 'f' * 64)
+    assert app.file_sha256(path) == 'f' * 64
+    # Consumido: a próxima chamada lê o disco
+    assert app.file_sha256(path) == hashlib.sha256(b'conteudo').hexdigest()
+
+
+def test_prune_removes_only_orphan_blobs(tmp_path, blobs):
+    kept = write(tmp_path / 'a.mp4', b'fica')
+    removed = write(tmp_path / 'b.mp4', b'sai')
+    kept_sha, _ = app.deduplicate_file(kept)
+    removed_sha, _ = app.deduplicate_file(removed)
+    os.remove(removed)
+
+    assert app.prune_orphan_blobs() == 1
+    assert os.path.exists(blobs / f'{kept_sha}.mp4')
+    assert not os.path.exists(blobs / f'{removed_sha}.mp4')
+    assert app.BLOB_STATS['pruned'] == 1
+    assert app.blob_metrics()['unique_blobs'] == 1
+
+
+def test_deduplicate_does_not_prune_on_the_request_thread(tmp_path, blobs, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app, 'prune_orphan_blobs', lambda: calls.append(1))
+    monkeypatch.setattr(app, 'ensure_blob_pruner', lambda: None)
+    app.deduplicate_file(write(tmp_path / 'a.mp4', b'x'))
+    assert calls == []
+
+
+def test_pruner_thread_starts_once(monkeypatch):
+    monkeypatch.setattr(app, 'BLOB_PRUNE_INTERVAL', 3600)
+    monkeypatch.setattr(app, 'BLOB_PRUNER_THREAD', None)
+    app.ensure_blob_pruner()
+    thread = app.BLOB_PRUNER_THREAD
+    assert thread.is_alive() and thread.name == 'blob-pruner'
+    app.ensure_blob_pruner()
+    assert app.BLOB_PRUNER_THREAD is thread
+
+
+def test_pruner_disabled_with_zero_interval(monkeypatch):
+    monkeypatch.setattr(app, 'BLOB_PRUNE_INTERVAL', 0)
+    monkeypatch.setattr(app, 'BLOB_PRUNER_THREAD', None)
+    app.ensure_blob_pruner()
+    assert app.BLOB_PRUNER_THREAD is None
@@ -0,0 +1,89 @@
+"""Sessões persistentes por domínio: reaproveitamento, cookies do Playwright e descarte"""
+import json
+import os
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def sessions(tmp_path, monkeypatch):
+    """Sem sessões prévias, sem proxies e com storage_state em pasta temporária"""
+    monkeypatch.setattr(app, 'DOMAIN_SESSIONS', {})
+    monkeypatch.setattr(app, 'PLAYWRIGHT_STORAGE_FILE', str(tmp_path / 'storage.json'))
+    monkeypatch.setattr(app, 'choose_proxy', lambda key=None: None)
+    return app.DOMAIN_SESSIONS
+
+
+def write_storage_state(cookies, user_agent='UA-Playwright', mtime=None):
+    path = app.PLAYWRIGHT_STORAGE_FILE
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'cookies': cookies, 'userAgent': user_agent}, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def cookie(name, domain='.urlebird.com', expires=-1):
+    return {'name': name, 'value': f'{name}-valor', 'domain': domain, 'path': '/', 'expires': expires}
+
+
+def test_session_is_reused_per_domain(sessions):
+    first = app.get_domain_session('urlebird.com')
+    assert app.get_domain_session('urlebird.com') is first
+    assert app.get_domain_session('countik.com') is not first
+    assert first.headers['User-Agent'] == app.DEFAULT_SCRAPER_USER_AGENT
+
+
+def test_playwright_cookies_are_applied_to_matching_domain(sessions):
+    write_storage_state([
+        cookie('cf_clearance'),
+        cookie('de_outro_site', domain='.example.com'),
+        cookie('expirado', expires=time.time() - 60),
+    ])
+    session = app.get_domain_session('urlebird.com')
+    assert session.cookies.get('cf_clearance') == 'cf_clearance-valor'
+    assert session.cookies.get('de_outro_site') is None
+    assert session.cookies.get('expirado') is None
+    # O cf_clearance só vale com o mesmo User-Agent que resolveu o desafio
+    assert session.headers['User-Agent'] == 'UA-Playwright'
+
+
+def test_storage_state_is_reloaded_only_when_it_changes(sessions):
+    write_storage_state([cookie('a')], mtime=1000)
+    session = app.get_domain_session('urlebird.com')
+    session.cookies.clear()
+
+    app.get_domain_session('urlebird.com')
+    assert session.cookies.get('a') is None
+
+    write_storage_state([cookie('b')], mtime=2000)
+    app.get_domain_session('urlebird.com')
+    assert session.cookies.get('b') == 'b-valor'
+
+
+def test_invalidate_creates_a_new_session(sessions, monkeypatch):
+    released = []
+    monkeypatch.setattr(app, 'release_proxy', released.append)
+    old = app.get_domain_session('urlebird.com')
+    app.invalidate_domain_session('urlebird.com')
+    assert 'urlebird.com' not in sessions
+    assert released == [app.upstream_proxy_key('urlebird.com')]
+    assert app.get_domain_session('urlebird.com') is not old
+
+
+class FakeResponse:
+    def __init__(self, status_code, server):
+        self.status_code = status_code
+        self.headers = {'Server': server}
+
+
+@pytest.mark.parametrize('status_code, server, expected', [
+    (403, 'cloudflare', True),
+    (503, 'Cloudflare', True),
+    (403, 'nginx', False),
+    (200, 'cloudflare', False),
+])
+def test_cloudflare_challenge_detection(status_code, server, expected):
+    assert app.is_cloudflare_challenge(FakeResponse(status_code, server)) is expected
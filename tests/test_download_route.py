@@ -0,0 +1,58 @@
+"""GET e POST /download: mesmo processamento a partir da query ou do body"""
+import pytest
+
+import app
+
+VIDEO_URL = 'https://www.tiktok.com/@usuario/video/1234567890'
+
+
+@pytest.fixture
+def downloaded(tmp_path, monkeypatch):
+    """download_tiktok_video sem rede: grava um arquivo e registra a variante pedida"""
+    calls = []
+
+    def fake_download(url, progress=None, cancel_event=None, variant='default', report=None):
+        calls.append((url, variant))
+        extension = '.mp3' if variant == 'audio' else '.mp4'
+        path = tmp_path / f'video{extension}'
+        path.write_bytes(b'conteudo')
+        report['variant'] = variant
+        return str(path), None
+
+    monkeypatch.setattr(app, 'download_tiktok_video', fake_download)
+    return calls
+
+
+def test_get_requires_url():
+    response = app.app.test_client().get('/download')
+    assert response.status_code == 400
+
+
+def test_get_rejects_invalid_variant(downloaded):
+    response = app.app.test_client().get('/download', query_string={'url': VIDEO_URL, 'variant': 'x'})
+    assert response.status_code == 400
+    assert 'variant' in response.get_json()['error']
+    assert downloaded == []
+
+
+def test_get_rejects_non_tiktok_url(downloaded):
+    response = app.app.test_client().get('/download', query_string={'url': 'x'})
+    assert response.status_code == 400
+    assert downloaded == []
+
+
+def test_get_downloads_with_variant(downloaded):
+    response = app.app.test_client().get('/download', query_string={'url': VIDEO_URL, 'variant': 'audio'})
+    assert response.status_code == 200
+    assert response.headers['X-Download-Variant'] == 'audio'
+    assert response.mimetype == 'audio/mpeg'
+    assert response.data == b'conteudo'
+    response.close()
+    assert downloaded == [(VIDEO_URL, 'audio')]
+
+
+def test_post_still_downloads(downloaded):
+    response = app.app.test_client().post('/download', json={'url': VIDEO_URL})
+    assert response.status_code == 200
+    response.close()
+    assert downloaded == [(VIDEO_URL, 'default')]
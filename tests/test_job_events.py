@@ -0,0 +1,90 @@
+"""Eventos SSE dos jobs em lote: replay com Last-Event-ID e espera por eventos novos"""
+import json
+import threading
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def batch_jobs(monkeypatch):
+    monkeypatch.setattr(app, 'BATCH_JOBS', {})
+    monkeypatch.setattr(app, 'JOB_QUEUE_BACKEND', 'local')
+
+
+def parse_events(body):
+    """Converte o texto SSE em [(id, evento, data)], ignorando keep-alives"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        if fields:
+            events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def finished_job():
+    job = app.create_batch_job(['https://www.tiktok.com/@a/video/1', 'https://www.tiktok.com/@a/video/2'])
+    app.emit_batch_event(job, 'started', index=0)
+    app.emit_batch_event(job, 'done', index=0)
+    job['finished_at'] = time.time()
+    return job
+
+
+def test_stream_replays_all_events_of_a_finished_job():
+    job = finished_job()
+    response = app.app.test_client().get(f"/download/jobs/{job['id']}/events")
+    assert response.mimetype == 'text/event-stream'
+    events = parse_events(response.get_data(as_text=True))
+    assert [(event_id, name) for event_id, name, _ in events] == [
+        (1, 'queued'), (2, 'queued'), (3, 'started'), (4, 'done')
+    ]
+    assert all(data['job_id'] == job['id'] for _, _, data in events)
+
+
+def test_last_event_id_resumes_after_that_event():
+    job = finished_job()
+    response = app.app.test_client().get(f"/download/jobs/{job['id']}/events", headers={'Last-Event-ID': '2'})
+    events = parse_events(response.get_data(as_text=True))
+    assert [event_id for event_id, _, _ in events] == [3, 4]
+
+
+def test_invalid_last_event_id_replays_from_start():
+    job = finished_job()
+    response = app.app.test_client().get(f"/download/jobs/{job['id']}/events", headers={'Last-Event-ID': 'abc'})
+    assert len(parse_events(response.get_data(as_text=True))) == 4
+
+
+def test_unknown_job_returns_404():
+    response = app.app.test_client().get('/download/jobs/nao-existe/events')
+    assert response.status_code == 404
+
+
+def test_stream_waits_for_new_events():
+    job = app.create_batch_job(['https://www.tiktok.com/@a/video/1'])
+    stream = app.iter_batch_events(job, last_event_id=1)
+
+    def finish():
+        time.sleep(0.05)
+        app.emit_batch_event(job, 'done', index=0)
+        with job['condition']:
+            job['finished_at'] = time.time()
+            job['condition'].notify_all()
+
+    threading.Thread(target=finish).start()
+    events = parse_events(''.join(stream))
+    assert [(event_id, name) for event_id, name, _ in events] == [(2, 'done')]
+
+
+def test_queued_job_events_resume_from_the_shared_queue(tmp_path, monkeypatch):
+    queue = app.SqliteJobQueue(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(app, 'get_job_queue', lambda: queue)
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    queue.claim('node-a')
+    for name in ('queued', 'started', 'done'):
+        queue.add_event(job_id, name, {'index': 0})
+    queue.finish(job_id, 'node-a', 'finished', None, None)
+
+    events = parse_events(''.join(app.iter_queued_job_events(job_id, last_event_id=1)))
+    assert [(event_id, name) for event_id, name, _ in events] == [(2, 'started'), (3, 'done')]
@@ -0,0 +1,122 @@
+"""Fila de jobs em SQLite: lease, renovação, retomada após expirar e webhook só do dono"""
+import pytest
+
+import app
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return app.SqliteJobQueue(str(tmp_path / 'jobs.db'))
+
+
+def test_claim_renew_and_finish(queue):
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    record = queue.claim('node-a')
+    assert record['id'] == job_id
+    assert record['status'] == 'running' and record['owner'] == 'node-a'
+    assert record['attempts'] == 1
+
+    # Nada mais para reivindicar enquanto o lease vale
+    assert queue.claim('node-b') is None
+    assert queue.heartbeat(job_id, 'node-a') == (True, False)
+
+    assert queue.finish(job_id, 'node-a', 'finished', {'total': 1}, {'results': []})
+    job = queue.get(job_id)
+    assert job['status'] == 'finished'
+    assert job['summary'] == {'total': 1}
+    assert queue.claim('node-b') is None
+
+
+def test_expired_lease_is_taken_over(queue, monkeypatch):
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    monkeypatch.setattr(app, 'JOB_LEASE_SECONDS', -1)
+    queue.claim('node-a')
+    monkeypatch.setattr(app, 'JOB_LEASE_SECONDS', 60)
+
+    record = queue.claim('node-b')
+    assert record['id'] == job_id
+    assert record['owner'] == 'node-b'
+    assert record['attempts'] == 2
+
+    # O dono antigo descobre no heartbeat e não consegue gravar o resultado
+    assert queue.heartbeat(job_id, 'node-a') == (False, False)
+    assert not queue.finish(job_id, 'node-a', 'finished', None, {'results': ['stale']})
+    assert queue.finish(job_id, 'node-b', 'finished', None, {'results': ['fresh']})
+    assert queue.get(job_id)['result'] == {'results': ['fresh']}
+
+
+def test_expired_lease_fails_after_max_attempts(queue, monkeypatch):
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    monkeypatch.setattr(app, 'JOB_MAX_ATTEMPTS', 1)
+    monkeypatch.setattr(app, 'JOB_LEASE_SECONDS', -1)
+    queue.claim('node-a')
+
+    assert queue.claim('node-b') is None
+    assert queue.get(job_id)['status'] == 'failed'
+
+
+def test_cancel_request_reaches_running_job(queue):
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    queue.claim('node-a')
+    queue.request_cancel(job_id)
+    assert queue.heartbeat(job_id, 'node-a') == (True, True)
+
+
+@pytest.fixture
+def worker(queue, monkeypatch):
+    """execute_claimed_job com a fila de teste, sem rede e com os webhooks capturados"""
+    sent = []
+    monkeypatch.setattr(app, 'get_job_queue', lambda: queue)
+    monkeypatch.setattr(app, 'enqueue_webhook', lambda url, event, payload: sent.append((url, event)))
+    monkeypatch.setattr(app, 'download_single_url',
+                        lambda url, *args, **kwargs: {'url': url, 'success': False, 'error': 'falhou'})
+    monkeypatch.setattr(app, 'mirror_job_event', lambda *args: None)
+    return sent
+
+
+def test_webhook_sent_after_finish(queue, worker):
+    job_id = queue.enqueue('download', {'urls': ['u'], 'callback_url': 'http://n8n/hook'})
+    app.execute_claimed_job(queue.claim(app.NODE_ID))
+    assert worker == [('http://n8n/hook', 'download.completed')]
+    assert queue.get(job_id)['status'] == 'finished'
+
+
+def test_no_webhook_when_lease_lost(queue, worker):
+    job_id = queue.enqueue('download', {'urls': ['u'], 'callback_url': 'http://n8n/hook'})
+    record = queue.claim(app.NODE_ID)
+    # Outro worker assumiu o job enquanto este executava
+    queue.db().execute("UPDATE jobs SET owner = 'node-b' WHERE id = ?", (job_id,))
+
+    app.execute_claimed_job(record)
+    assert worker == []
+    assert queue.get(job_id)['status'] == 'running'
+
+
+def test_summary_update_requires_the_lease(queue, monkeypatch):
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    monkeypatch.setattr(app, 'JOB_LEASE_SECONDS', -1)
+    queue.claim('node-a')
+    monkeypatch.setattr(app, 'JOB_LEASE_SECONDS', 60)
+    queue.claim('node-b')
+
+    queue.update_summary(job_id, 'node-b', {'completed': 1})
+    queue.update_summary(job_id, 'node-a', {'completed': 0})
+    assert queue.get(job_id)['summary'] == {'completed': 1}
+
+    queue.finish(job_id, 'node-b', 'finished', {'completed': 2}, None)
+    queue.update_summary(job_id, 'node-b', {'completed': 1})
+    assert queue.get(job_id)['summary'] == {'completed': 2}
+
+
+def test_old_jobs_and_files_are_pruned_on_enqueue(queue, monkeypatch):
+    job_id = queue.enqueue('download', {'urls': ['u']})
+    queue.claim('node-a')
+    queue.add_event(job_id, 'done', {'filename': 'a.mp4'})
+    queue.register_file('a.mp4', 'node-a', 'http://node-a')
+    queue.finish(job_id, 'node-a', 'finished', None, None)
+
+    monkeypatch.setattr(app, 'BATCH_JOB_TTL', -1)
+    queue.enqueue('download', {'urls': ['v']})
+    assert queue.get(job_id) is None
+    assert queue.get_events(job_id) == []
+    assert queue.lookup_file('a.mp4') is None
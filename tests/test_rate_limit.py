@@ -0,0 +1,90 @@
+"""Limite de taxa por host upstream (token bucket): rajada, reposição e espera máxima"""
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def buckets(monkeypatch):
+    """Um host com 2 req/s e rajada de 3, sem buckets prévios"""
+    monkeypatch.setattr(app, 'UPSTREAM_RATE_LIMITS', {'tikwm.com': (2.0, 3.0)})
+    monkeypatch.setattr(app, 'RATE_LIMIT_BUCKETS', {})
+    return app.RATE_LIMIT_BUCKETS
+
+
+def advance(buckets, seconds):
+    """Simula a passagem do tempo recuando a última atualização do bucket"""
+    buckets['tikwm.com']['updated_at'] -= seconds
+
+
+def test_parse_rate_limits_overrides_defaults():
+    limits = app.parse_rate_limits('tikwm.com=1:2, Novo.com=0.5, urlebird.com=0, invalido')
+    assert limits['tikwm.com'] == (1.0, 2.0)
+    # Sem rajada: o mínimo é 1 requisição
+    assert limits['novo.com'] == (0.5, 1.0)
+    # Taxa 0 remove o limite do host
+    assert 'urlebird.com' not in limits
+    assert limits['snaptik.app'] == app.DEFAULT_UPSTREAM_RATE_LIMITS['snaptik.app']
+
+
+@pytest.mark.parametrize('url_or_host, expected', [
+    ('https://www.tikwm.com/api/user/posts', 'tikwm.com'),
+    ('TIKWM.COM:443', 'tikwm.com'),
+    ('https://example.com/tikwm.com', None),
+    (None, None),
+])
+def test_host_matching_includes_subdomains(url_or_host, expected):
+    assert app.rate_limit_host(url_or_host) == expected
+
+
+def test_burst_is_free_then_requests_queue(buckets):
+    for _ in range(3):
+        assert app.reserve_upstream_slot('tikwm.com') == ('tikwm.com', 0.0, None)
+
+    # Saldo negativo forma uma fila: cada reserva espera mais 1/taxa
+    _, first_wait, _ = app.reserve_upstream_slot('tikwm.com')
+    _, second_wait, _ = app.reserve_upstream_slot('tikwm.com')
+    assert first_wait == pytest.approx(0.5, abs=0.05)
+    assert second_wait == pytest.approx(1.0, abs=0.05)
+    assert buckets['tikwm.com']['waited'] == 2
+
+
+def test_tokens_refill_over_time_up_to_burst(buckets):
+    for _ in range(3):
+        app.reserve_upstream_slot('tikwm.com')
+    advance(buckets, 1.0)
+    assert app.reserve_upstream_slot('tikwm.com')[1] == 0.0
+    assert app.reserve_upstream_slot('tikwm.com')[1] == 0.0
+    assert app.reserve_upstream_slot('tikwm.com')[1] > 0
+
+    # Muito tempo ocioso não acumula além da rajada
+    advance(buckets, 3600)
+    waits = [app.reserve_upstream_slot('tikwm.com')[1] for _ in range(4)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] > 0
+
+
+def test_wait_above_max_is_rejected_without_reserving(buckets):
+    for _ in range(3):
+        app.reserve_upstream_slot('tikwm.com')
+    host, wait, error = app.reserve_upstream_slot('tikwm.com', max_wait=0.1)
+    assert error and 'tikwm.com' in error
+    assert wait == pytest.approx(0.5, abs=0.05)
+    bucket = buckets['tikwm.com']
+    assert bucket['rejected'] == 1
+    assert bucket['tokens'] == pytest.approx(0.0, abs=0.1)
+
+
+def test_unlimited_host_never_waits(buckets):
+    assert app.reserve_upstream_slot('https://example.com/x') == (None, 0.0, None)
+    assert buckets == {}
+
+
+def test_call_upstream_raises_when_rate_limited(buckets, monkeypatch):
+    monkeypatch.setattr(app, 'RATE_LIMIT_MAX_WAIT', 0.1)
+    for _ in range(3):
+        app.reserve_upstream_slot('tikwm.com')
+    calls = []
+    with pytest.raises(app.RateLimitExceeded):
+        app.call_upstream(lambda: calls.append(1), 'https://tikwm.com/api')
+    assert calls == []
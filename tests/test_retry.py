@@ -0,0 +1,129 @@
+"""Política de retentativa: respostas transitórias, backoff, Retry-After e orçamento"""
+import pytest
+import requests
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def retry_policy(monkeypatch):
+    """3 tentativas sem espera real, sem prazo e com contadores zerados"""
+    monkeypatch.setattr(app, 'RETRY_MAX_ATTEMPTS', 3)
+    monkeypatch.setattr(app, 'RETRY_BASE_DELAY', 0.0)
+    monkeypatch.setattr(app, 'RETRY_STATS', {'retries': 0, 'recovered': 0, 'exhausted': 0, 'budget_exhausted': 0})
+    app.start_deadline(None)
+    app.start_retry_budget(10)
+    yield app.RETRY_STATS
+    app.start_retry_budget()
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def sequence(*outcomes):
+    """send() que devolve/levanta cada resultado em ordem e registra as chamadas"""
+    calls = []
+
+    def send():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return send, calls
+
+
+@pytest.mark.parametrize('status_code, retryable', [
+    (429, True), (500, True), (502, True), (503, True), (504, True), (408, True),
+    (200, False), (400, False), (403, False), (404, False),
+])
+def test_retryable_status_codes(status_code, retryable):
+    assert app.is_retryable_response(FakeResponse(status_code)) is retryable
+
+
+def test_object_without_status_is_not_retryable():
+    assert not app.is_retryable_response([{'video': 1}])
+    assert not app.is_retryable_response(None)
+
+
+def test_transient_status_is_retried_until_success(retry_policy):
+    first = FakeResponse(503)
+    send, calls = sequence(first, FakeResponse(200))
+    response = app.call_upstream(send, 'example.com')
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert first.closed
+    assert retry_policy['retries'] == 1 and retry_policy['recovered'] == 1
+
+
+def test_last_response_returned_when_attempts_run_out(retry_policy):
+    send, calls = sequence(FakeResponse(500), FakeResponse(502), FakeResponse(503))
+    response = app.call_upstream(send, 'example.com')
+    assert response.status_code == 503
+    assert len(calls) == 3
+    assert retry_policy['exhausted'] == 1
+
+
+def test_network_errors_are_retried_and_reraised():
+    error = requests.exceptions.ConnectionError('falhou')
+    send, calls = sequence(error, error, error)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        app.call_upstream(send, 'example.com')
+    assert len(calls) == 3
+
+
+def test_other_exceptions_are_not_retried():
+    send, calls = sequence(ValueError('json inválido'))
+    with pytest.raises(ValueError):
+        app.call_upstream(send, 'example.com')
+    assert len(calls) == 1
+
+
+def test_client_error_is_returned_immediately():
+    send, calls = sequence(FakeResponse(404))
+    assert app.call_upstream(send, 'example.com').status_code == 404
+    assert len(calls) == 1
+
+
+def test_budget_is_shared_by_all_calls_of_the_request(retry_policy):
+    app.start_retry_budget(1)
+    send, calls = sequence(FakeResponse(503), FakeResponse(503), FakeResponse(200))
+    assert app.call_upstream(send, 'example.com').status_code == 503
+    assert len(calls) == 2
+
+    # Orçamento esgotado: a próxima chamada não repete nada
+    send, calls = sequence(FakeResponse(503), FakeResponse(200))
+    assert app.call_upstream(send, 'example.com').status_code == 503
+    assert len(calls) == 1
+    assert retry_policy['budget_exhausted'] == 2
+
+
+def test_retry_delay_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(app, 'RETRY_MAX_DELAY', 8)
+    assert app.retry_delay(1, FakeResponse(429, {'Retry-After': '3'})) == 3.0
+    assert app.retry_delay(1, FakeResponse(429, {'Retry-After': '120'})) == 8.0
+
+
+def test_backoff_is_exponential_with_full_jitter(monkeypatch):
+    monkeypatch.setattr(app, 'RETRY_BASE_DELAY', 0.5)
+    monkeypatch.setattr(app, 'RETRY_MAX_DELAY', 3)
+    for attempt, cap in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 3)):
+        delays = [app.retry_delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > cap / 2
+
+
+def test_delay_never_sleeps_past_the_deadline(monkeypatch):
+    monkeypatch.setattr(app, 'DEADLINE_MIN_STAGE_SECONDS', 1)
+    app.start_deadline(3)
+    try:
+        assert app.capped_retry_delay(1, FakeResponse(429, {'Retry-After': '8'})) <= 2
+    finally:
+        app.start_deadline(None)
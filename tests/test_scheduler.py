@@ -0,0 +1,168 @@
+"""Agendador por faixas: vagas reservadas, pesos (stride) e desistência da fila"""
+import collections
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    """3 vagas, 1 reservada para interactive e pesos 4:1, com estado zerado"""
+    monkeypatch.setattr(app, 'WORK_SLOTS', 3)
+    monkeypatch.setattr(app, 'PRIORITY_RESERVED_SLOTS', 1)
+    monkeypatch.setattr(app, 'SCHEDULER_VIRTUAL_TIME', 0.0)
+    lanes = {
+        lane: {
+            'weight': weight, 'pass': 0.0, 'waiting': collections.deque(), 'running': 0,
+            'granted': 0, 'timeouts': 0, 'waits': collections.deque(maxlen=app.PRIORITY_WAIT_SAMPLES),
+        }
+        for lane, weight in ((app.INTERACTIVE_LANE, 4.0), (app.BULK_LANE, 1.0))
+    }
+    monkeypatch.setattr(app, 'LANES', lanes)
+    return lanes
+
+
+def enqueue(lane, granted_log):
+    waiter = app.enqueue_work_slot(lane, lambda: granted_log.append(lane))
+    return waiter
+
+
+def test_free_slot_is_granted_immediately(scheduler):
+    waiter = enqueue(app.BULK_LANE, [])
+    assert waiter['granted']
+    assert scheduler[app.BULK_LANE]['running'] == 1
+
+
+def test_bulk_never_takes_reserved_slots(scheduler):
+    log = []
+    bulk = [enqueue(app.BULK_LANE, log) for _ in range(3)]
+    assert [w['granted'] for w in bulk] == [True, True, False]
+    assert app.lane_slot_limit(app.BULK_LANE) == 2
+
+    # A vaga reservada continua livre para interactive, mesmo com bulk na fila
+    interactive = enqueue(app.INTERACTIVE_LANE, log)
+    assert interactive['granted']
+    assert scheduler[app.BULK_LANE]['waiting'][0] is bulk[2]
+
+
+def test_interactive_waits_when_all_slots_busy(scheduler):
+    log = []
+    for _ in range(3):
+        assert enqueue(app.INTERACTIVE_LANE, log)['granted']
+    waiter = enqueue(app.INTERACTIVE_LANE, log)
+    assert not waiter['granted']
+
+    app.release_work_slot(app.INTERACTIVE_LANE)
+    assert waiter['granted']
+    assert log == [app.INTERACTIVE_LANE]
+
+
+def test_dispatch_follows_lane_weights(scheduler, monkeypatch):
+    monkeypatch.setattr(app, 'WORK_SLOTS', 1)
+    monkeypatch.setattr(app, 'PRIORITY_RESERVED_SLOTS', 0)
+    log = []
+    holder = enqueue(app.INTERACTIVE_LANE, log)
+    assert holder['granted']
+    for _ in range(10):
+        enqueue(app.BULK_LANE, log)
+        enqueue(app.INTERACTIVE_LANE, log)
+
+    lane = app.INTERACTIVE_LANE
+    for _ in range(10):
+        app.release_work_slot(lane)
+        lane = log[-1]
+
+    # Peso 4:1 -> a cada 5 vagas liberadas, 4 vão para interactive
+    assert log[:10].count(app.INTERACTIVE_LANE) == 8
+    assert log[:10].count(app.BULK_LANE) == 2
+
+
+def test_idle_lane_does_not_bank_credit(scheduler, monkeypatch):
+    monkeypatch.setattr(app, 'WORK_SLOTS', 1)
+    monkeypatch.setattr(app, 'PRIORITY_RESERVED_SLOTS', 0)
+    log = []
+    # Só interactive roda por um tempo; bulk fica ocioso
+    for _ in range(20):
+        assert enqueue(app.INTERACTIVE_LANE, log)['granted']
+        app.release_work_slot(app.INTERACTIVE_LANE)
+
+    holder = enqueue(app.INTERACTIVE_LANE, log)
+    assert holder['granted']
+    for _ in range(5):
+        enqueue(app.BULK_LANE, log)
+        enqueue(app.INTERACTIVE_LANE, log)
+    lane = app.INTERACTIVE_LANE
+    for _ in range(5):
+        app.release_work_slot(lane)
+        lane = log[-1]
+
+    # Bulk não recebe uma rajada de vagas "atrasadas" ao voltar
+    assert log[:5].count(app.BULK_LANE) <= 2
+
+
+def test_abandon_removes_waiter_and_counts_timeout(scheduler):
+    log = []
+    for _ in range(2):
+        enqueue(app.BULK_LANE, log)
+    waiter = enqueue(app.BULK_LANE, log)
+
+    assert app.abandon_work_slot(waiter) is False
+    assert not scheduler[app.BULK_LANE]['waiting']
+    assert scheduler[app.BULK_LANE]['timeouts'] == 1
+
+    # Liberar uma vaga não acorda quem já desistiu
+    app.release_work_slot(app.BULK_LANE)
+    assert log == []
+
+
+def test_abandon_after_grant_keeps_slot(scheduler):
+    log = []
+    for _ in range(2):
+        enqueue(app.BULK_LANE, log)
+    waiter = enqueue(app.BULK_LANE, log)
+    app.release_work_slot(app.BULK_LANE)
+    assert waiter['granted']
+
+    assert app.abandon_work_slot(waiter) is True
+    assert scheduler[app.BULK_LANE]['running'] == 2
+    assert scheduler[app.BULK_LANE]['timeouts'] == 0
+
+
+def test_work_slot_honours_deadline(scheduler):
+    for _ in range(3):
+        enqueue(app.INTERACTIVE_LANE, [])
+    app.set_lane(app.INTERACTIVE_LANE)
+    app.start_deadline(0.05)
+    try:
+        with pytest.raises(app.DeadlineExceeded):
+            with app.work_slot('download'):
+                pass
+    finally:
+        app.start_deadline(None)
+    assert scheduler[app.INTERACTIVE_LANE]['timeouts'] == 1
+    assert not scheduler[app.INTERACTIVE_LANE]['waiting']
+
+
+def test_nested_work_slot_reuses_held_slot(scheduler, monkeypatch):
+    monkeypatch.setattr(app, 'WORK_SLOTS', 1)
+    app.set_lane(app.INTERACTIVE_LANE)
+    with app.work_slot():
+        with app.work_slot():
+            assert scheduler[app.INTERACTIVE_LANE]['running'] == 1
+    assert scheduler[app.INTERACTIVE_LANE]['running'] == 0
+
+
+@pytest.mark.parametrize('header, item_count, lane', [
+    (None, 1, app.INTERACTIVE_LANE),
+    (None, 5, app.BULK_LANE),
+    ('interactive', 5, app.BULK_LANE),
+    ('bulk', 1, app.BULK_LANE),
+    ('desconhecida', 1, app.INTERACTIVE_LANE),
+])
+def test_request_lane_comes_from_the_work(scheduler, header, item_count, lane):
+    headers = {'X-Priority': header} if header else {}
+    with app.app.test_request_context('/download', method='POST', headers=headers):
+        app.init_request_context()
+        app.request_lane(item_count)
+        assert app.current_lane() == lane
@@ -0,0 +1,113 @@
+"""Links curtos: chave de cache, resolução única e despejo do cache em memória"""
+import threading
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def video_db(tmp_path, monkeypatch):
+    """Banco de vídeos e cache de links curtos isolados por teste"""
+    monkeypatch.setattr(app, 'VIDEO_DB_PATH', str(tmp_path / 'videos.db'))
+    monkeypatch.setattr(app, 'VIDEO_DB_LOCAL', threading.local())
+    monkeypatch.setattr(app, 'SHORT_LINK_CACHE', {})
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeSession:
+    """Sessão que redireciona cada link curto para o destino configurado"""
+
+    def __init__(self, redirects, head_redirects=True):
+        self.redirects = redirects
+        self.head_redirects = head_redirects
+        self.calls = []
+
+    def head(self, url, **kwargs):
+        self.calls.append(('HEAD', url))
+        return FakeResponse(self.redirects[url] if self.head_redirects else url)
+
+    def get(self, url, **kwargs):
+        self.calls.append(('GET', url))
+        return FakeResponse(self.redirects[url])
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession({
+        'https://vm.tiktok.com/ZMabcDEF/': 'https://www.tiktok.com/@um/video/111?is_from_webapp=1',
+        'https://vm.tiktok.com/ZMABCdef/': 'https://www.tiktok.com/@dois/video/222',
+    })
+    monkeypatch.setattr(app, 'get_domain_session', lambda domain: session)
+    return session
+
+
+def test_key_keeps_case_of_the_short_code():
+    assert app.short_link_key('https://vm.tiktok.com/ZMabcDEF/') == 'https://vm.tiktok.com/ZMabcDEF'
+    assert app.short_link_key('https://vm.tiktok.com/ZMabcDEF/') != app.short_link_key('https://vm.tiktok.com/ZMABCdef/')
+
+
+def test_key_normalizes_scheme_host_query_and_slash():
+    assert app.short_link_key(' HTTPS://VM.TikTok.com/ZMabcDEF/?_r=1#x ') == 'https://vm.tiktok.com/ZMabcDEF'
+
+
+def test_links_differing_only_in_case_resolve_separately(session):
+    first, error = app.resolve_short_link('https://vm.tiktok.com/ZMabcDEF/')
+    assert error is None
+    second, error = app.resolve_short_link('https://vm.tiktok.com/ZMABCdef/')
+    assert error is None
+    assert first == 'https://www.tiktok.com/@um/video/111'
+    assert second == 'https://www.tiktok.com/@dois/video/222'
+
+    # Também no SQLite, sem depender do cache em memória
+    app.SHORT_LINK_CACHE.clear()
+    assert app.lookup_short_link('https://vm.tiktok.com/ZMabcDEF') == first
+    assert app.lookup_short_link('https://vm.tiktok.com/ZMABCdef') == second
+
+
+def test_resolved_link_is_not_requested_again(session):
+    url = 'https://vm.tiktok.com/ZMabcDEF/'
+    app.resolve_short_link(url)
+    app.resolve_short_link(url + '?_t=abc')
+    assert session.calls == [('HEAD', url)]
+
+
+def test_get_fallback_goes_through_call_upstream(session, monkeypatch):
+    session.head_redirects = False
+    hosts = []
+    real_call_upstream = app.call_upstream
+
+    def tracking_call_upstream(send, url_or_host=None, max_attempts=None):
+        hosts.append(url_or_host)
+        return real_call_upstream(send, url_or_host, max_attempts)
+
+    monkeypatch.setattr(app, 'call_upstream', tracking_call_upstream)
+    url = 'https://vm.tiktok.com/ZMabcDEF/'
+    canonical_url, error = app.resolve_short_link(url)
+    assert error is None
+    assert canonical_url == 'https://www.tiktok.com/@um/video/111'
+    assert session.calls == [('HEAD', url), ('GET', url)]
+    assert hosts == [url, url]
+
+
+def test_full_cache_evicts_oldest_entry(monkeypatch):
+    monkeypatch.setattr(app, 'SHORT_LINK_CACHE_MAX', 2)
+    app.remember_short_link('a', 'A')
+    app.remember_short_link('b', 'B')
+    app.remember_short_link('c', 'C')
+    assert app.SHORT_LINK_CACHE == {'b': 'B', 'c': 'C'}
@@ -0,0 +1,89 @@
+"""Índice SQLite de vídeos: upsert sem perder campos, TTL dos metadados e consultas"""
+import threading
+import time
+
+import pytest
+
+import app
+
+# ID real do TikTok: os 32 bits altos trazem a data de postagem
+VIDEO_ID = '7350000000000000000'
+
+
+@pytest.fixture(autouse=True)
+def video_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'VIDEO_DB_PATH', str(tmp_path / 'videos.db'))
+    monkeypatch.setattr(app, 'VIDEO_DB_LOCAL', threading.local())
+
+
+def test_posted_timestamp_comes_from_the_video_id():
+    assert app.video_id_timestamp(VIDEO_ID) == int(VIDEO_ID) >> 32
+    assert app.video_id_timestamp('abc') is None
+    assert app.video_id_timestamp(None) is None
+
+
+def test_store_video_keeps_known_fields(tmp_path):
+    app.store_video(VIDEO_ID, 'Usuario', 'https://www.tiktok.com/@Usuario/video/' + VIDEO_ID,
+                    {'caption': 'legenda', 'views': 10}, source='tikwm')
+    app.store_video(VIDEO_ID, file_path=str(tmp_path / 'v.mp4'), file_size=3, sha256='ab')
+
+    video = app.get_stored_video(VIDEO_ID)
+    assert video['username'] == 'usuario'
+    assert video['caption'] == 'legenda'
+    assert video['views'] == '10'
+    assert video['source'] == 'tikwm'
+    assert video['file_size'] == 3 and video['sha256'] == 'ab'
+    assert video['posted_ts'] == app.video_id_timestamp(VIDEO_ID)
+
+
+def test_store_video_ignores_missing_id():
+    app.store_video(None, 'usuario')
+    assert app.list_stored_videos() == []
+
+
+def test_fresh_metadata_respects_ttl(monkeypatch):
+    app.store_video(VIDEO_ID, 'usuario', details={'caption': 'legenda'})
+    assert app.get_fresh_stored_metadata(VIDEO_ID)['caption'] == 'legenda'
+    assert app.get_fresh_stored_metadata(VIDEO_ID, max_age=-1) is None
+
+    # Sem metadados (só o arquivo) não conta como dado fresco
+    app.store_video('7350000000000000001', 'usuario', file_path='/tmp/x.mp4')
+    assert app.get_fresh_stored_metadata('7350000000000000001') is None
+
+
+def test_find_downloaded_file_requires_the_file_on_disk(tmp_path):
+    path = tmp_path / 'v.mp4'
+    path.write_bytes(b'x')
+    app.store_video(VIDEO_ID, 'usuario', file_path=str(path))
+    assert app.find_downloaded_file(VIDEO_ID)['file_path'] == str(path)
+
+    path.unlink()
+    assert app.find_downloaded_file(VIDEO_ID) is None
+
+
+def test_list_filters_and_orders_by_posted_time(tmp_path):
+    older, newer = '7300000000000000000', '7400000000000000000'
+    app.store_video(older, 'usuario', file_path=str(tmp_path / 'a.mp4'))
+    app.store_video(newer, 'usuario')
+    app.store_video('7350000000000000000', 'outro')
+
+    assert [v['video_id'] for v in app.list_stored_videos('USUARIO')] == [newer, older]
+    assert [v['video_id'] for v in app.list_stored_videos('usuario', downloaded_only=True)] == [older]
+    assert len(app.list_stored_videos(limit=1)) == 1
+
+
+def test_record_download_indexes_only_the_default_variant(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'deduplicate_file', lambda path: ('f' * 64, False))
+    url = 'https://www.tiktok.com/@usuario/video/' + VIDEO_ID
+    audio = tmp_path / 'a.mp3'
+    audio.write_bytes(b'mp3')
+    assert app.record_download(url, str(audio), variant='audio') == 'f' * 64
+    assert app.get_stored_video(VIDEO_ID) is None
+
+    video = tmp_path / 'v.mp4'
+    video.write_bytes(b'video')
+    app.record_download(url, str(video), source='tikwm')
+    stored = app.get_stored_video(VIDEO_ID)
+    assert stored['file_path'] == str(video)
+    assert stored['file_size'] == 5
+    assert stored['downloaded_at'] <= time.time()
@@ -0,0 +1,102 @@
+"""Monitoramento de canais: validação do registro em create_watch e POST /watch"""
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def watches(monkeypatch):
+    """WATCHES vazio, sem gravar estado em disco e sem subir o agendador"""
+    state = {}
+    monkeypatch.setattr(app, 'WATCHES', state)
+    monkeypatch.setattr(app, 'save_watch_state', lambda: None)
+    monkeypatch.setattr(app, 'ensure_watch_scheduler', lambda: None)
+    monkeypatch.setattr(app, 'WATCH_MIN_INTERVAL', 60)
+    return state
+
+
+def test_invalid_username_is_rejected(watches):
+    watch, error = app.create_watch('nome com espaço!')
+    assert watch is None
+    assert error == "Username inválido"
+    assert watches == {}
+
+
+@pytest.mark.parametrize('interval', ['abc', [60], {}])
+def test_non_numeric_interval_is_rejected(watches, interval):
+    watch, error = app.create_watch('usuario', interval)
+    assert watch is None
+    assert 'interval_seconds' in error
+    assert watches == {}
+
+
+def test_interval_below_minimum_is_rejected(watches):
+    watch, error = app.create_watch('usuario', 10)
+    assert watch is None
+    assert 'mínimo 60' in error
+
+
+def test_valid_watch_uses_defaults(watches):
+    watch, error = app.create_watch('@Usuario')
+    assert error is None
+    assert watch['channel'] == 'Usuario'
+    assert watch['interval_seconds'] == app.WATCH_DEFAULT_INTERVAL
+    assert watch['callback_url'] is None
+    assert watches == {watch['id']: watch}
+
+
+def test_numeric_string_interval_is_accepted(watches):
+    watch, error = app.create_watch('usuario', '120')
+    assert error is None
+    assert watch['interval_seconds'] == 120
+
+
+@pytest.mark.parametrize('body', [
+    {'channel': 'usuario', 'interval_seconds': 'abc'},
+    {'channel': 'usuario', 'interval_seconds': [60]},
+    {'channel': 'usuario', 'interval_seconds': 10},
+    {'channel': 'usuario', 'callback_url': 'ftp://n8n/hook'},
+    {'interval_seconds': 120},
+])
+def test_endpoint_rejects_invalid_body_with_400(watches, body):
+    response = app.app.test_client().post('/watch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    assert watches == {}
+
+
+def test_endpoint_reports_invalid_channels(watches):
+    response = app.app.test_client().post('/watch', json={'channels': ['usuario', 'nome inválido!']})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['success'] == 1 and body['failed'] == 1
+    assert body['results'][1]['error'] == "Username inválido"
+
+
+def test_reregister_keeps_fields_not_sent(watches):
+    watch, _ = app.create_watch('usuario', 300, 'http://n8n/hook')
+    again, error = app.create_watch('@USUARIO')
+    assert error is None
+    assert again is watch
+    assert again['interval_seconds'] == 300
+    assert again['callback_url'] == 'http://n8n/hook'
+    assert len(watches) == 1
+
+
+def test_reregister_updates_only_sent_fields(watches):
+    app.create_watch('usuario', 300, 'http://n8n/hook')
+    client = app.app.test_client()
+    response = client.post('/watch', json={'channel': 'usuario', 'interval_seconds': 120})
+    assert response.status_code == 201
+    watch = response.get_json()['results'][0]
+    assert watch['interval_seconds'] == 120
+    assert watch['callback_url'] == 'http://n8n/hook'
+
+
+def test_null_callback_url_removes_webhook(watches):
+    app.create_watch('usuario', 300, 'http://n8n/hook')
+    response = app.app.test_client().post('/watch', json={'channel': 'usuario', 'callback_url': None})
+    assert response.status_code == 201
+    watch = response.get_json()['results'][0]
+    assert watch['callback_url'] is None
+    assert watch['interval_seconds'] == 300